@@ -1,6 +1,10 @@
 import streamlit as st
+import hashlib
 import os
+import uuid
+import diskcache
 import requests
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 import cms_utils
 
@@ -29,6 +33,125 @@ if not api_url or not api_token or not default_password:
     st.error("❌ Missing Configuration! Check .env.local or Streamlit Secrets.")
     st.stop()
 
+# Processed blobs live in a short-lived disk cache rather than in
+# st.session_state, so a 100-image batch doesn't pin ~20MB of JPEG bytes in
+# the process heap (and get re-pickled) on every rerun. Session state holds
+# only {"name", "key"} stubs.
+@st.cache_resource
+def _blob_cache():
+    return diskcache.Cache('/tmp/cms_cache', size_limit=1 << 30)
+
+def _stash_blobs(items):
+    """Park processed bytes in the disk cache; return session-state stubs."""
+    cache = _blob_cache()
+    stashed = []
+    for item in items:
+        key = uuid.uuid4().hex
+        cache.set(key, item['bytes'], expire=3600)
+        stashed.append({"name": item['name'], "key": key})
+    return stashed
+
+def _pop_blobs(items):
+    cache = _blob_cache()
+    for item in items:
+        cache.pop(item['key'], None)
+
+def _preflight(files, sniffer):
+    """Split uploads into (valid, rejected-with-reason) before any CPU work.
+
+    Checks the declared size against MAX_UPLOAD_BYTES and sniffs the magic
+    bytes, so a 500MB file or a renamed non-media file is skipped with a
+    warning instead of burning a full decode."""
+    valid, rejected = [], []
+    for f in files:
+        if f.size > cms_utils.MAX_UPLOAD_BYTES:
+            rejected.append(f"{f.name} (over {cms_utils.MAX_UPLOAD_BYTES // (1024 * 1024)}MB)")
+            continue
+        head = f.read(16)
+        f.seek(0)
+        if not sniffer(head):
+            rejected.append(f"{f.name} (unrecognized format)")
+            continue
+        valid.append(f)
+    return valid, rejected
+
+def _batch_key(files):
+    """Cheap cache key for a batch: (name, sha256) per file, so the cached
+    helpers hash ~64 bytes per file instead of the raw payloads."""
+    return tuple((f.name, hashlib.sha256(f.getvalue()).hexdigest()) for f in files)
+
+# One long-lived worker pool per server process: spawning a fresh pool on
+# every batch click costs a few hundred ms of worker startup, and
+# st.cache_resource hands back the same executor across reruns.
+@st.cache_resource
+def _worker_pool():
+    return ProcessPoolExecutor(max_workers=os.cpu_count())
+
+def _pooled_process(files, worker, args, _progress):
+    """
+    Run worker(file_bytes, *args) over UploadedFiles on the shared process
+    pool, reading each file only when it is submitted and keeping at most
+    2x workers in flight, so a large batch never sits fully read in RAM.
+    Returns {index: result}.
+    """
+    max_workers = os.cpu_count() or 1
+    results = {}
+    pool = _worker_pool()
+    pending = {}
+    queue = iter(enumerate(files))
+
+    def submit_next():
+        for idx, f in queue:
+            pending[pool.submit(worker, f.getvalue(), *args)] = idx
+            return
+
+    for _ in range(max_workers * 2):
+        submit_next()
+
+    done = 0
+    while pending:
+        fut = next(as_completed(pending))
+        idx = pending.pop(fut)
+        results[idx] = fut.result()
+        done += 1
+        if _progress: _progress(done, len(files), files[idx].name)
+        submit_next()
+    return results
+
+# Cached batch processing. Streamlit reruns the whole script on every widget
+# interaction; memoizing on the file digests means re-clicking "Process" with
+# the same selection returns instantly instead of redoing resize/encode work.
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_process_images(batch_key, mode, _files, _progress=None):
+    """batch_key: _batch_key(_files). Returns [{"name", "bytes"}, ...]."""
+    results = _pooled_process(_files, cms_utils.process_image, (mode,), _progress)
+
+    processed_data = []
+    for idx, f in enumerate(_files):
+        p_bytes = results.get(idx)
+        if p_bytes:
+            new_name = os.path.splitext(f.name)[0] + ".jpg"
+            if mode == 'square': new_name = new_name.replace(".jpg", "_sq.jpg")
+            processed_data.append({"name": new_name, "bytes": p_bytes})
+    return processed_data
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_process_audios(batch_key, channels, _files, _progress=None):
+    """batch_key: _batch_key(_files). Returns [{"name", "bytes"}, ...]."""
+    results = _pooled_process(_files, cms_utils.process_audio, (channels,), _progress)
+
+    processed_data = []
+    for idx, f in enumerate(_files):
+        p_bytes = results.get(idx)
+        if p_bytes:
+            processed_data.append({"name": os.path.splitext(f.name)[0] + ".mp3", "bytes": p_bytes})
+    return processed_data
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_process_image(file_bytes, mode):
+    """Single-image variant for the team member photo."""
+    return cms_utils.process_image(file_bytes, mode)
+
 st.title("Admin Dashboard")
 
 # Session State Initialization
@@ -54,23 +177,21 @@ with tab_img:
         if not uploaded_images:
             st.warning("No images selected.")
         else:
-            processed_data = []
+            valid_images, rejected = _preflight(uploaded_images, cms_utils.sniff_image)
+            if rejected:
+                st.warning("Skipped: " + ", ".join(rejected))
+
             progress_bar = st.progress(0)
             status_text = st.empty()
-            
-            for idx, img_file in enumerate(uploaded_images):
-                status_text.text(f"Processing {img_file.name}...")
-                file_bytes = img_file.read()
-                p_bytes = cms_utils.process_image(file_bytes, mode=mode_key)
-                
-                if p_bytes:
-                    new_name = os.path.splitext(img_file.name)[0] + ".jpg"
-                    if mode_key == 'square': new_name = new_name.replace(".jpg", "_sq.jpg")
-                    processed_data.append({"name": new_name, "bytes": p_bytes})
-                
-                progress_bar.progress((idx + 1) / len(uploaded_images))
-            
-            st.session_state['processed_images'] = processed_data
+
+            def _report(done, total, name):
+                status_text.text(f"Processing {name}...")
+                progress_bar.progress(done / total)
+
+            processed_data = _cached_process_images(
+                _batch_key(valid_images), mode_key, valid_images, _progress=_report)
+
+            st.session_state['processed_images'] = _stash_blobs(processed_data)
             status_text.empty()
             st.success(f"Processed {len(processed_data)} images. Ready for upload verification.")
 
@@ -83,19 +204,28 @@ with tab_img:
         
         if st.button("Step 2: Authenticate & Upload"):
             if auth_pass == default_password:
-                success_count = 0
-                prog = st.progress(0)
-                
-                for idx, item in enumerate(st.session_state['processed_images']):
-                    asset = cms_utils.upload_asset(api_url, api_token, item['bytes'], item['name'])
-                    if asset: success_count += 1
-                    prog.progress((idx + 1) / len(st.session_state['processed_images']))
-                
-                if success_count == len(st.session_state['processed_images']):
-                    st.success(f"All {success_count} images uploaded successfully!")
-                    st.session_state['processed_images'] = [] # Clear
+                # Processed images are small (<200KB each), so the whole
+                # batch goes up in a single multipart POST — one round-trip
+                # instead of one per asset.
+                items = st.session_state['processed_images']
+                cache = _blob_cache()
+                payload = [{"name": it['name'], "bytes": cache.get(it['key'])} for it in items]
+                if any(p['bytes'] is None for p in payload):
+                    # Cached blobs expire after 1h (or get evicted); uploading
+                    # would POST empty files, so bail out instead.
+                    st.error("Processed images have expired from the cache — please re-run Step 1.")
+                    st.session_state['processed_images'] = []
                 else:
-                    st.warning(f"Uploaded {success_count}/{len(st.session_state['processed_images'])} images.")
+                    with st.spinner(f"Uploading {len(items)} images in one request..."):
+                        assets = cms_utils.upload_assets_batch(api_url, api_token, payload)
+                    success_count = len(assets) if assets else 0
+
+                    if success_count == len(items):
+                        st.success(f"All {success_count} images uploaded successfully!")
+                        _pop_blobs(items)
+                        st.session_state['processed_images'] = [] # Clear
+                    else:
+                        st.warning(f"Uploaded {success_count}/{len(items)} images.")
             else:
                 st.error("Incorrect Password.")
 
@@ -115,23 +245,22 @@ with tab_audio:
         if not uploaded_audios:
             st.warning("No audio files selected.")
         else:
-            processed_data = []
+            valid_audios, rejected = _preflight(uploaded_audios, cms_utils.sniff_audio)
+            if rejected:
+                st.warning("Skipped: " + ", ".join(rejected))
+
             progress_bar = st.progress(0)
             status_text = st.empty()
             channels = 1 if "Mono" in channel_mode else 2
-            
-            for idx, audio_file in enumerate(uploaded_audios):
-                status_text.text(f"Compressing {audio_file.name}...")
-                file_bytes = audio_file.read()
-                p_bytes = cms_utils.process_audio(file_bytes, audio_file.name, channels=channels)
-                
-                if p_bytes:
-                    new_name = os.path.splitext(audio_file.name)[0] + ".mp3"
-                    processed_data.append({"name": new_name, "bytes": p_bytes})
-                
-                progress_bar.progress((idx + 1) / len(uploaded_audios))
-                
-            st.session_state['processed_audio'] = processed_data
+
+            def _report(done, total, name):
+                status_text.text(f"Compressing {name}...")
+                progress_bar.progress(done / total)
+
+            processed_data = _cached_process_audios(
+                _batch_key(valid_audios), channels, valid_audios, _progress=_report)
+
+            st.session_state['processed_audio'] = _stash_blobs(processed_data)
             status_text.empty()
             st.success(f"Processed {len(processed_data)} audio files. Ready for upload verification.")
             
@@ -144,18 +273,32 @@ with tab_audio:
         
         if st.button("Step 2: Authenticate & Upload Audio"):
             if auth_pass_audio == default_password:
-                success_count = 0
-                prog = st.progress(0)
-                
-                for idx, item in enumerate(st.session_state['processed_audio']):
-                    asset = cms_utils.upload_asset(api_url, api_token, item['bytes'], item['name'])
-                    if asset: 
-                        success_count += 1
-                        st.write(f"✅ Uploaded: {item['name']}")
-                    prog.progress((idx + 1) / len(st.session_state['processed_audio']))
-                
-                st.success(f"Completed! Uploaded {success_count} files.")
-                st.session_state['processed_audio'] = [] # Clear
+                items = st.session_state['processed_audio']
+                cache = _blob_cache()
+                payload = [{"name": it['name'], "bytes": cache.get(it['key'])} for it in items]
+                if any(p['bytes'] is None for p in payload):
+                    # Cached blobs expire after 1h (or get evicted); uploading
+                    # would POST empty files, so bail out instead.
+                    st.error("Processed audio has expired from the cache — please re-run Step 1.")
+                    st.session_state['processed_audio'] = []
+                else:
+                    success_count = 0
+                    prog = st.progress(0)
+
+                    with ThreadPoolExecutor(max_workers=8) as pool:
+                        futures = {
+                            pool.submit(cms_utils.upload_asset, api_url, api_token, p['bytes'], p['name']): p['name']
+                            for p in payload
+                        }
+                        for done, fut in enumerate(as_completed(futures)):
+                            if fut.result():
+                                success_count += 1
+                                st.write(f"✅ Uploaded: {futures[fut]}")
+                            prog.progress((done + 1) / len(items))
+
+                    st.success(f"Completed! Uploaded {success_count} files.")
+                    _pop_blobs(items)
+                    st.session_state['processed_audio'] = [] # Clear
             else:
                 st.error("Incorrect Password.")
 
@@ -179,8 +322,10 @@ with tab_team:
     if st.button("Step 1: Process & Preview"):
         if not t_name or not t_role or not t_photo:
             st.error("Name, Role, and Photo are required.")
+        elif _preflight([t_photo], cms_utils.sniff_image)[1]:
+            st.error("Photo is too large or not a recognized image format.")
         else:
-            p_bytes = cms_utils.process_image(t_photo.read(), mode='square')
+            p_bytes = _cached_process_image(t_photo.read(), 'square')
             if p_bytes:
                 st.image(p_bytes, caption="Processed Image Preview (Square)", width=200)
                 st.session_state['processed_teammember'] = {
@@ -1,9 +1,87 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder
+from urllib3.util.retry import Retry
 from io import BytesIO
 from PIL import Image
 import subprocess
-import time
+import uuid
+
+LANCZOS = Image.Resampling.LANCZOS
+
+# Preflight limit: reject anything bigger before burning CPU/RAM on it.
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+
+def sniff_image(head):
+    """True if the first bytes look like a JPEG/PNG/WEBP image."""
+    return (
+        head[:3] == b'\xff\xd8\xff'                          # JPEG
+        or head[:8] == b'\x89PNG\r\n\x1a\n'                  # PNG
+        or (head[:4] == b'RIFF' and head[8:12] == b'WEBP')   # WEBP
+    )
+
+def sniff_audio(head):
+    """True if the first bytes look like MP3/WAV/OGG/M4A audio."""
+    return (
+        head[:3] == b'ID3'                                   # MP3 with ID3 tag
+        # bare MPEG frame: 11-bit sync covers all versions/layers/CRC flags
+        or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0)
+        or (head[:4] == b'RIFF' and head[8:12] == b'WAVE')   # WAV
+        or head[:4] == b'OggS'                               # OGG
+        or head[4:8] == b'ftyp'                              # M4A/MP4 container
+    )
+
+# Optional in-process MP3 pipeline: decoding with libsndfile and encoding
+# with libmp3lame avoids a fork/exec of ffmpeg per file.
+try:
+    import numpy as np
+    import soundfile as sf
+    import lameenc
+    _HAS_INPROCESS_MP3 = True
+except ImportError:
+    _HAS_INPROCESS_MP3 = False
+
+# Shared session so parallel uploads reuse keep-alive connections
+# instead of paying a TCP+TLS handshake per asset.
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.3),
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+# HTTP/2 multiplexes parallel uploads over a single TLS connection instead
+# of one handshake per pooled socket. Fall back to the requests SESSION
+# when httpx isn't installed.
+try:
+    import httpx
+    _HTTP2_CLIENT = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=8, max_keepalive_connections=8),
+        timeout=60,
+    )
+except ImportError:
+    _HTTP2_CLIENT = None
+
+# orjson parses small JSON bodies ~10x faster than the stdlib.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Extension -> MIME type for uploads; lowercased lookup so .JPG/.PNG etc.
+# are classified correctly.
+_MIME = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp',
+    '.mp3': 'audio/mpeg',
+    '.mp4': 'video/mp4',
+}
 
 def process_image(file_bytes, mode='horizontal'):
     """
@@ -14,35 +92,59 @@ def process_image(file_bytes, mode='horizontal'):
     """
     try:
         img = Image.open(BytesIO(file_bytes))
-        
+
+        target_size = (800, 800) if mode == 'square' else (1280, 720)
+        if img.format == 'JPEG':
+            # Ask libjpeg to decode at 1/2, 1/4 or 1/8 scale straight from
+            # the DCT coefficients (never below target_size) — far cheaper
+            # than a full decode followed by downscaling.
+            img.draft('RGB', target_size)
+
         if mode == 'square':
             # Calculate center crop dimensions
             width, height = img.size
             new_size = min(width, height)
             
-            left = (width - new_size) / 2
-            top = (height - new_size) / 2
-            right = (width + new_size) / 2
-            bottom = (height + new_size) / 2
+            # Integer coords: crop() takes Pillow's integer fast path instead
+            # of float-coercing and re-rounding each edge.
+            left = (width - new_size) // 2
+            top = (height - new_size) // 2
+            right = left + new_size
+            bottom = top + new_size
             
             # Crop to square
             img = img.crop((left, top, right, bottom))
             
-            # Resize directly to 800x800
-            target_size = (800, 800)
-            img = img.resize(target_size, Image.Resampling.LANCZOS)
-            
+            # Downscale to 800x800. thumbnail() does a box-filter pre-pass
+            # before the LANCZOS convolution, a big win on large phone photos.
+            # It never upscales, so small inputs still go through resize().
+            if img.size[0] > target_size[0]:
+                img.thumbnail(target_size, LANCZOS, reducing_gap=2.0)
+            else:
+                img = img.resize(target_size, LANCZOS)
+
         else:
             # Horizontal (16:9) - Force resize to 1280x720
             # Note: The rough code just resized, it didn't crop to aspect ratio first.
             # Assuming force resize is intended as per rough code.
-            target_size = (1280, 720)
-            img = img.resize(target_size, Image.Resampling.LANCZOS)
+            # Cheap integer box-filter reduce first when the input dwarfs the
+            # target, so LANCZOS runs on far fewer pixels.
+            factor = min(img.size[0] // target_size[0], img.size[1] // target_size[1])
+            if factor >= 2:
+                img = img.reduce(factor)
+            img = img.resize(target_size, LANCZOS, reducing_gap=2.0)
         
         # Save to bytes with compression
         out_buffer = BytesIO()
-        # Convert to RGB to ensure JPEG compatibility (remove alpha channel if PNG)
-        img.convert('RGB').save(out_buffer, format='JPEG', quality=60)
+        # Convert to RGB to ensure JPEG compatibility (remove alpha channel if
+        # PNG). JPEG input is already RGB, so skip the full-frame copy then.
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        # optimize + progressive shave ~5-15% off the file for a small CPU
+        # cost; subsampling=2 forces 4:2:0 chroma. Upload bandwidth is the
+        # bottleneck downstream, so smaller bytes win overall.
+        img.save(out_buffer, format='JPEG', quality=60,
+                 optimize=True, progressive=True, subsampling=2)
         
         return out_buffer.getvalue()
         
@@ -50,47 +152,103 @@ def process_image(file_bytes, mode='horizontal'):
         print(f"Image Processing Error: {e}")
         return None
 
-def process_audio(file_bytes, original_filename, channels=1):
+def _encode_mp3_inprocess(file_bytes, channels):
     """
-    Convert audio to low-bitrate MP3 using ffmpeg directly.
-    Target: 64kbps, Channels: 1 (Mono) or 2 (Stereo)
-    Requires ffmpeg to be installed and in PATH.
+    Decode with libsndfile and encode 64kbps MP3 with libmp3lame, all
+    in-process. Returns None when the input container isn't one
+    libsndfile understands (e.g. m4a) so the caller can fall back to ffmpeg.
     """
     try:
-        ext = original_filename.split('.')[-1].lower()
-        temp_in = f"temp_audio_in_{int(time.time())}.{ext}"
-        temp_out = f"temp_audio_out_{int(time.time())}.mp3"
-        
+        data, sample_rate = sf.read(BytesIO(file_bytes), dtype='int16', always_2d=True)
+        src_channels = data.shape[1]
+        if src_channels > 2:
+            return None  # lame only does mono/stereo; let ffmpeg downmix
+
+        # Downmix stereo to mono when requested
+        if channels == 1 and src_channels == 2:
+            data = (data.astype(np.int32).sum(axis=1) // 2).astype(np.int16)
+            src_channels = 1
+
+        encoder = lameenc.Encoder()
+        encoder.set_bit_rate(64)
+        encoder.set_in_sample_rate(sample_rate)
+        encoder.set_channels(src_channels)
+        encoder.set_quality(7)
+        encoder.silence()
+        return bytes(encoder.encode(data.tobytes()) + encoder.flush())
+    except Exception:
+        return None
+
+def _ffmpeg_tempfile(file_bytes, channels):
+    """
+    Encode via ffmpeg with a real input file. Needed for containers ffmpeg
+    can't demux from a pipe (m4a/mp4 with a trailing moov atom requires a
+    seekable input). uuid-named temp files avoid collisions between
+    concurrent requests.
+    """
+    temp_in = f"temp_audio_in_{uuid.uuid4().hex}"
+    temp_out = f"temp_audio_out_{uuid.uuid4().hex}.mp3"
+    try:
         with open(temp_in, "wb") as f:
             f.write(file_bytes)
-            
-        # ffmpeg command: -i input -b:a 64k -ac {channels} -y output
-        # -y overwrites output file if exists
+
         cmd = [
-            "ffmpeg", 
-            "-i", temp_in, 
-            "-b:a", "64k", 
-            "-ac", str(channels), 
-            "-y", 
+            "ffmpeg",
+            "-hide_banner", "-loglevel", "error",
+            "-i", temp_in,
+            "-b:a", "64k",
+            "-ac", str(channels),
+            "-y",
             temp_out
         ]
-        
-        # Run ffmpeg, capture output to avoid spamming console
-        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
-        # Read back
+        subprocess.run(cmd, capture_output=True, check=True)
+
         with open(temp_out, "rb") as f:
-            processed_bytes = f.read()
-            
-        # Cleanup
+            return f.read()
+    finally:
+        for path in (temp_in, temp_out):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def process_audio(file_bytes, channels=1):
+    """
+    Convert audio to low-bitrate MP3.
+    Target: 64kbps, Channels: 1 (Mono) or 2 (Stereo)
+    WAV/FLAC/OGG inputs are encoded in-process via lameenc (no process
+    spawn per file); everything else goes through ffmpeg, piping
+    stdin/stdout where the container allows it and falling back to
+    uuid-named temp files where it doesn't.
+    """
+    if _HAS_INPROCESS_MP3:
+        encoded = _encode_mp3_inprocess(file_bytes, channels)
+        if encoded:
+            return encoded
+
+    try:
+        # m4a/mp4 usually store the moov atom after the audio data, which
+        # ffmpeg can't demux from an unseekable pipe.
+        if file_bytes[4:8] == b'ftyp':
+            return _ffmpeg_tempfile(file_bytes, channels)
+
+        cmd = [
+            "ffmpeg",
+            "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-b:a", "64k",
+            "-ac", str(channels),
+            "-f", "mp3",
+            "pipe:1"
+        ]
+
         try:
-            os.remove(temp_in)
-            os.remove(temp_out)
-        except:
-            pass
-            
-        return processed_bytes
-        
+            result = subprocess.run(cmd, input=file_bytes, capture_output=True, check=True)
+            return result.stdout
+        except subprocess.CalledProcessError:
+            # Some other non-seekable container edge case — retry from disk.
+            return _ffmpeg_tempfile(file_bytes, channels)
+
     except subprocess.CalledProcessError as e:
         print(f"FFmpeg Error: {e.stderr.decode()}")
         return None
@@ -98,27 +256,35 @@ def process_audio(file_bytes, original_filename, channels=1):
         print(f"Audio Processing Error: {e}")
         return None
 
-def upload_asset(api_url, api_token, file_bytes, filename):
+def upload_asset(api_url, api_token, file_bytes, filename, session=None):
     """
     Upload byte content as an asset.
     Endpoint: /api/assets/upload (Custom)
+    Prefers the shared HTTP/2 client so parallel uploads multiplex one
+    connection; an explicitly passed session (or missing httpx) falls back
+    to the requests SESSION with a streaming multipart body.
     """
     upload_url = f"{api_url}/api/assets/upload"
     headers = {'api-key': api_token}
-    
-    # MIME type guess
-    mime = 'application/octet-stream'
-    if filename.endswith('.jpg') or filename.endswith('.jpeg'):
-        mime = 'image/jpeg'
-    elif filename.endswith('.mp3'):
-        mime = 'audio/mpeg'
-        
-    files = {
-        'files[]': (filename, BytesIO(file_bytes), mime)
-    }
-    
+
+    # MIME type lookup
+    mime = _MIME.get(os.path.splitext(filename)[1].lower(), 'application/octet-stream')
+
     try:
-        resp = requests.post(upload_url, headers=headers, files=files, timeout=60)
+        if session is None and _HTTP2_CLIENT is not None:
+            resp = _HTTP2_CLIENT.post(
+                upload_url, headers=headers,
+                files={'files[]': (filename, file_bytes, mime)})
+        else:
+            if session is None:
+                session = SESSION
+            # MultipartEncoder streams the body in chunks instead of
+            # materializing a second full copy the way requests' files= does.
+            encoder = MultipartEncoder(fields={
+                'files[]': (filename, BytesIO(file_bytes), mime)
+            })
+            headers['Content-Type'] = encoder.content_type
+            resp = session.post(upload_url, headers=headers, data=encoder, timeout=60)
         resp.raise_for_status()
         result = resp.json()
         
@@ -135,6 +301,40 @@ def upload_asset(api_url, api_token, file_bytes, filename):
         print(f"Upload Error: {e}")
         return None
 
+def upload_assets_batch(api_url, api_token, items, session=None):
+    """
+    Upload several processed files in one multipart POST.
+    Endpoint: /api/assets/upload (Custom) — files[] accepts an array, so a
+    whole batch costs one round-trip instead of one per asset.
+    items: list of {"name", "bytes"}. Returns the created asset dicts in
+    the same order, or None on failure.
+    """
+    if session is None:
+        session = SESSION
+    upload_url = f"{api_url}/api/assets/upload"
+    headers = {'api-key': api_token}
+
+    files = [
+        ('files[]', (item['name'], BytesIO(item['bytes']),
+                     _MIME.get(os.path.splitext(item['name'])[1].lower(), 'application/octet-stream')))
+        for item in items
+    ]
+
+    try:
+        resp = session.post(upload_url, headers=headers, files=files, timeout=300)
+        resp.raise_for_status()
+        result = resp.json()
+
+        if isinstance(result, dict) and 'assets' in result:
+            return result['assets']
+        elif isinstance(result, list):
+            return result
+
+        return None
+    except Exception as e:
+        print(f"Batch Upload Error: {e}")
+        return None
+
 def create_collection_entry(api_url, api_token, collection_name, data):
     """
     Create a general collection entry.
@@ -143,14 +343,17 @@ def create_collection_entry(api_url, api_token, collection_name, data):
     endpoint = f"{api_url}/api/content/item/{collection_name}"
     headers = {
         'api-key': api_token,
-        'Content-Type': 'application/json'
+        'Content-Type': 'application/json',
+        'Accept-Encoding': 'gzip'
     }
-    
+
     payload = {"data": data}
-    
+
     try:
-        resp = requests.post(endpoint, json=payload, headers=headers, timeout=30)
+        resp = SESSION.post(endpoint, json=payload, headers=headers, timeout=30)
         resp.raise_for_status()
+        if orjson is not None:
+            return orjson.loads(resp.content)
         return resp.json()
     except Exception as e:
         print(f"Entry Creation Error: {e}")